@@ -1,14 +1,18 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Form, Query
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Form, Query, BackgroundTasks
 from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from sqlalchemy.orm import Session
+from typing import List
 import os, shutil, uuid, json, logging, time, numpy as np, csv, io
 from datetime import datetime
-from database_models import get_db, init_db, OMRSheet, Result, ProcessingLog
+from database_models import get_db, init_db, SessionLocal, OMRSheet, Result, ProcessingLog
 
 app = FastAPI(title="OMR Evaluation System", version="1.0.0")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
+# Sheet listings and CSV exports are repetitive text and shrink well on the wire
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 for d in ["uploads", "exports", "processed_images", "overlay_images", "answer_keys"]:
     os.makedirs(d, exist_ok=True)
@@ -19,6 +23,12 @@ app.mount("/exports", StaticFiles(directory="exports"), name="exports")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Background processing jobs by sheet id: {"state", "percent", "result", "error"};
+# finished jobs stay pollable until more than MAX_FINISHED_JOBS have piled up
+processing_jobs = {}
+PROCESSING_STAGES = 4
+MAX_FINISHED_JOBS = 100
+
 @app.on_event("startup")
 async def startup_event():
     init_db()
@@ -28,68 +38,146 @@ async def startup_event():
 async def root():
     return {"message": "OMR Evaluation System API", "version": "1.0.0"}
 
+def save_uploaded_sheet(file: UploadFile, db: Session):
+    ext = os.path.splitext(file.filename)[1]
+    filename = f"{uuid.uuid4()}{ext}"
+    save_path = os.path.join("uploads", filename)
+    with open(save_path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+    student_id = f"STU_{str(uuid.uuid4())[:8]}"
+    sheet = OMRSheet(student_id=student_id, exam_id=1, filename=filename, processing_status="uploaded")
+    db.add(sheet)
+    db.commit()
+    db.refresh(sheet)
+    log_entry = ProcessingLog(sheet_id=sheet.id, stage="upload", status="success", message=f"Uploaded {filename}")
+    db.add(log_entry)
+    db.commit()
+    return sheet
+
 @app.post("/upload-sheet/")
 async def upload_omr_sheet(file: UploadFile = File(...), exam_version: str = Form("A"), db: Session = Depends(get_db)):
     try:
         if not file.content_type.startswith("image/"):
             raise HTTPException(400, "File must be an image")
-        ext = os.path.splitext(file.filename)[1]
-        filename = f"{uuid.uuid4()}{ext}"
-        save_path = os.path.join("uploads", filename)
-        with open(save_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        student_id = f"STU_{str(uuid.uuid4())[:8]}"
-        sheet = OMRSheet(student_id=student_id, exam_id=1, filename=filename, processing_status="uploaded")
-        db.add(sheet)
-        db.commit()
-        db.refresh(sheet)
-        log_entry = ProcessingLog(sheet_id=sheet.id, stage="upload", status="success", message=f"Uploaded {filename}")
-        db.add(log_entry)
-        db.commit()
-        return {"message": "Sheet uploaded successfully", "sheet_id": sheet.id, "filename": filename, "status": "uploaded"}
+        sheet = save_uploaded_sheet(file, db)
+        return {"message": "Sheet uploaded successfully", "sheet_id": sheet.id, "filename": sheet.filename, "status": "uploaded"}
     except Exception as e:
         logger.error(f"Upload error: {e}")
         raise HTTPException(500, f"Upload failed: {str(e)}")
 
-@app.post("/process-sheet/{sheet_id}")
-async def process_omr_sheet(sheet_id: int, exam_version: str = Query("A"), db: Session = Depends(get_db)):
+@app.post("/upload-sheets-bulk/")
+async def upload_omr_sheets_bulk(files: List[UploadFile] = File(...), exam_version: str = Form("A"), db: Session = Depends(get_db)):
     try:
-        sheet = db.query(OMRSheet).filter(OMRSheet.id == sheet_id).first()
-        if not sheet:
-            raise HTTPException(404, "Sheet not found")
-        sheet.processing_status = "processing"
-        db.commit()
-        time.sleep(2)
-        subjects = ["Data Analytics", "Machine Learning", "Python Programming", "Statistics", "Database Management"]
-        subject_scores = {}
-        total_correct = 0
-        for subject in subjects:
-            correct = np.random.randint(15, 20)
-            wrong = 20 - correct
-            score_percentage = (correct / 20) * 100
-            subject_scores[subject] = {"correct": correct, "wrong": wrong, "blank": 0, "score_percentage": round(score_percentage, 2), "total_questions": 20}
-            total_correct += correct
-        total_questions, total_percentage = 100, (total_correct / 100) * 100
-        sheet.processing_status, sheet.processing_time, sheet.total_score = "completed", 2.0, total_correct
-        db.commit()
-        for subject, data in subject_scores.items():
-            result = Result(sheet_id=sheet_id, subject_name=subject, correct_answers=data["correct"], wrong_answers=data["wrong"], score_percentage=data["score_percentage"], detected_answers=json.dumps({}))
-            db.add(result)
-        db.commit()
-        log_entry = ProcessingLog(sheet_id=sheet_id, stage="completed", status="success", message="Sheet processed successfully", confidence_score=0.95)
-        db.add(log_entry)
+        # Validate the whole batch first so a bad file does not leave a partial upload behind
+        for file in files:
+            if not file.content_type.startswith("image/"):
+                raise HTTPException(400, f"File must be an image: {file.filename}")
+        sheets = [save_uploaded_sheet(file, db) for file in files]
+        return {"message": f"{len(sheets)} sheets uploaded successfully", "sheets": [{"sheet_id": sheet.id, "filename": sheet.filename, "status": "uploaded"} for sheet in sheets]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Bulk upload error: {e}")
+        raise HTTPException(500, f"Bulk upload failed: {str(e)}")
+
+def process_sheet_record(sheet_id: int, db: Session, on_progress=None):
+    sheet = db.query(OMRSheet).filter(OMRSheet.id == sheet_id).first()
+    if not sheet:
+        raise HTTPException(404, "Sheet not found")
+    if sheet.processing_status == "completed":
+        raise HTTPException(409, "Sheet already processed")
+    sheet.processing_status = "processing"
+    db.commit()
+    for stage in range(1, PROCESSING_STAGES + 1):
+        time.sleep(2 / PROCESSING_STAGES)
+        if on_progress:
+            on_progress(int(stage / (PROCESSING_STAGES + 1) * 100))
+    subjects = ["Data Analytics", "Machine Learning", "Python Programming", "Statistics", "Database Management"]
+    subject_scores = {}
+    total_correct = 0
+    for subject in subjects:
+        correct = np.random.randint(15, 20)
+        wrong = 20 - correct
+        score_percentage = (correct / 20) * 100
+        subject_scores[subject] = {"correct": correct, "wrong": wrong, "blank": 0, "score_percentage": round(score_percentage, 2), "total_questions": 20}
+        total_correct += correct
+    total_questions, total_percentage = 100, (total_correct / 100) * 100
+    sheet.processing_status, sheet.processing_time, sheet.total_score = "completed", 2.0, total_correct
+    db.commit()
+    for subject, data in subject_scores.items():
+        result = Result(sheet_id=sheet_id, subject_name=subject, correct_answers=data["correct"], wrong_answers=data["wrong"], score_percentage=data["score_percentage"], detected_answers=json.dumps({}))
+        db.add(result)
+    db.commit()
+    log_entry = ProcessingLog(sheet_id=sheet_id, stage="completed", status="success", message="Sheet processed successfully", confidence_score=0.95)
+    db.add(log_entry)
+    db.commit()
+    return {"message": "Sheet processed successfully", "sheet_id": sheet_id, "processing_time": 2.0, "total_score": total_correct, "total_questions": total_questions, "percentage": round(total_percentage, 2), "subject_scores": subject_scores}
+
+def mark_sheet_error(sheet_id: int, db: Session):
+    db.rollback()
+    sheet = db.query(OMRSheet).filter(OMRSheet.id == sheet_id).first()
+    if sheet:
+        sheet.processing_status = "error"
         db.commit()
-        return {"message": "Sheet processed successfully", "sheet_id": sheet_id, "processing_time": 2.0, "total_score": total_correct, "total_questions": total_questions, "percentage": round(total_percentage, 2), "subject_scores": subject_scores}
+
+def prune_processing_jobs():
+    finished = [sheet_id for sheet_id, job in processing_jobs.items() if job["state"] in ("done", "error")]
+    for sheet_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        processing_jobs.pop(sheet_id, None)
+
+def run_processing_job(sheet_id: int):
+    # Runs after the response is sent, so it needs its own database session
+    job = processing_jobs[sheet_id]
+    db = SessionLocal()
+    try:
+        job["state"] = "processing"
+        job["result"] = process_sheet_record(sheet_id, db, lambda percent: job.update(percent=percent))
+        job.update(state="done", percent=100)
+    except HTTPException as e:
+        # Missing or already graded sheets keep their stored status
+        job.update(state="error", error=e.detail)
+    except Exception as e:
+        logger.error(f"Processing error: {e}")
+        mark_sheet_error(sheet_id, db)
+        job.update(state="error", error=str(e))
+    finally:
+        db.close()
+
+# A plain def runs in FastAPI's threadpool, so concurrent sheets don't queue behind the blocking grading step
+@app.post("/process-sheet/{sheet_id}")
+def process_omr_sheet(sheet_id: int, exam_version: str = Query("A"), db: Session = Depends(get_db)):
+    try:
+        return process_sheet_record(sheet_id, db)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Processing error: {e}")
-        sheet = db.query(OMRSheet).filter(OMRSheet.id == sheet_id).first()
-        if sheet:
-            sheet.processing_status = "error"
-            db.commit()
+        mark_sheet_error(sheet_id, db)
         raise HTTPException(500, f"Processing failed: {str(e)}")
 
+@app.post("/process-sheet/{sheet_id}/start", status_code=202)
+async def start_omr_sheet_processing(sheet_id: int, background_tasks: BackgroundTasks, exam_version: str = Query("A"), db: Session = Depends(get_db)):
+    sheet = db.query(OMRSheet).filter(OMRSheet.id == sheet_id).first()
+    if not sheet:
+        raise HTTPException(404, "Sheet not found")
+    # Running and finished jobs are reported as they are; only a failed one is retried
+    job = processing_jobs.get(sheet_id)
+    if job and job["state"] != "error":
+        return {"job_id": sheet_id, "state": job["state"], "percent": job["percent"]}
+    if sheet.processing_status == "completed":
+        raise HTTPException(409, "Sheet already processed")
+    prune_processing_jobs()
+    processing_jobs[sheet_id] = {"state": "queued", "percent": 0, "result": None, "error": None}
+    background_tasks.add_task(run_processing_job, sheet_id)
+    return {"job_id": sheet_id, "state": "queued", "percent": 0}
+
+@app.get("/process-sheet/{sheet_id}/progress")
+async def get_omr_sheet_progress(sheet_id: int):
+    job = processing_jobs.get(sheet_id)
+    if not job:
+        raise HTTPException(404, "No processing job for this sheet")
+    return {"job_id": sheet_id, **job}
+
 @app.get("/sheet/{sheet_id}/results")
 async def get_sheet_results(sheet_id: int, db: Session = Depends(get_db)):
     try:
@@ -1,13 +1,21 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
 import pandas as pd
+import numpy as np
 from PIL import Image
 import io
 import json
-import plotly.express as px
-import plotly.graph_objects as go
+# Plotly is imported lazily inside the chart builders; it is only needed on the
+# pages that draw charts and is slow to import on a cold start
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
+import socket
+import hashlib
+from urllib.parse import urlsplit
 
 # Try to import the back camera input
 try:
@@ -16,6 +24,13 @@ try:
 except ImportError:
     BACK_CAMERA_AVAILABLE = False
 
+# Try to import orjson for faster decoding of large sheet lists
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="Scanalyze - OMR Evaluation System",
@@ -26,15 +41,83 @@ st.set_page_config(
 
 API_BASE_URL = "http://localhost:8000"
 
-def apply_custom_css():
-    """Apply custom CSS for stunning UI with dark/light mode support"""
-    
-    # Check if dark mode is enabled
-    dark_mode = st.session_state.get('dark_mode', False)
-    
-    if dark_mode:
-        # Dark mode styles with lighter bluish theme
-        st.markdown("""
+# (connect, read) timeouts so a stalled backend can't block the script thread
+API_TIMEOUT = (3.05, 10)
+PROCESS_TIMEOUT = (3.05, 30)
+HEALTH_TIMEOUT = 0.5
+
+# Concurrent backend requests during bulk processing, shared by every session
+# through get_executor(); the dashboard fan-out gets its own smaller pool so a
+# bulk run can't starve it
+MAX_WORKERS = 16
+FANOUT_WORKERS = 4
+
+# Minimum seconds between bulk progress repaints
+PROGRESS_INTERVAL = 0.2
+
+# Seconds between polls of a background processing job, and how long to wait for it
+POLL_INTERVAL = 0.3
+JOB_TIMEOUT = 30
+
+# Fixed table width avoids the client-side auto-sizing pass on every rerun
+TABLE_WIDTH = 720
+
+# Camera captures are downscaled and re-encoded before upload; bubbles stay
+# legible well below full phone resolution
+CAMERA_MAX_SIDE = 1600
+CAMERA_JPEG_QUALITY = 75
+
+# Upload previews are shown as small JPEG thumbnails instead of the full images
+PREVIEW_MAX_SIDE = 800
+
+SUMMARY_COLUMNS = ["📄 Filename", "🆔 Student ID", "📊 Total Score", "📈 Percentage", "⏱️ Processing Time", "✅ Status"]
+
+# Sidebar navigation; lookups are prebuilt so the radio renders without scanning the list
+MENU_ITEMS = [
+    {"name": "🏠 Home", "key": "home"},
+    {"name": "📤 Upload & Process", "key": "upload"},
+    {"name": "📷 Camera Capture", "key": "camera"},
+    {"name": "📊 View Results", "key": "results"},
+    {"name": "📈 Dashboard", "key": "dashboard"},
+    {"name": "📥 Export Data", "key": "export"},
+    {"name": "ℹ️ About", "key": "about"}
+]
+MENU_KEYS = [item["key"] for item in MENU_ITEMS]
+MENU_NAMES = {item["key"]: item["name"] for item in MENU_ITEMS}
+MENU_INDEX = {key: i for i, key in enumerate(MENU_KEYS)}
+
+@st.cache_resource
+def get_session():
+    """Shared HTTP session that retries transient backend failures with backoff"""
+    # A refused connection means the backend is down, so don't retry it
+    retries = Retry(
+        total=3,
+        connect=0,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        # Uploads are streamed and cannot be replayed, so only GETs are retried
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False
+    )
+    # Keep enough idle keep-alive sockets for every worker thread plus the script thread
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=2 * MAX_WORKERS, max_retries=retries)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource
+def get_executor():
+    """Shared thread pool that keeps blocking HTTP calls off the script thread"""
+    return ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="omr-http")
+
+@st.cache_resource
+def get_fanout_executor():
+    """Small thread pool for the dashboard's per-sheet lookups"""
+    return ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="omr-fanout")
+
+# Dark mode styles with lighter bluish theme
+DARK_CSS = """
         <style>
         /* Dark Mode Styles */
         .stApp {
@@ -71,6 +154,31 @@ def apply_custom_css():
             box-shadow: 0 8px 25px rgba(59, 130, 246, 0.4);
         }
         
+        .feature-card-grid {
+            display: grid;
+            grid-template-columns: repeat(3, 1fr);
+            gap: 1rem;
+            margin-bottom: 1rem;
+        }
+        
+        .feature-card-grid.steps {
+            grid-template-columns: repeat(4, 1fr);
+        }
+        
+        .feature-card-grid .feature-card {
+            margin-bottom: 0;
+        }
+        
+        .feature-card-grid h3, .feature-card-grid p {
+            color: inherit;
+        }
+        
+        @media (max-width: 768px) {
+            .feature-card-grid, .feature-card-grid.steps {
+                grid-template-columns: 1fr;
+            }
+        }
+        
         .metric-card {
             background: linear-gradient(135deg, #3b82f6 0%, #60a5fa 100%);
             padding: 1.5rem;
@@ -145,10 +253,10 @@ def apply_custom_css():
         }
 
         </style>
-        """, unsafe_allow_html=True)
-    else:
-        # Light mode styles with lighter bluish theme
-        st.markdown("""
+        """
+
+# Light mode styles with lighter bluish theme
+LIGHT_CSS = """
         <style>
         /* Light Mode Styles */
         .stApp {
@@ -184,6 +292,31 @@ def apply_custom_css():
             box-shadow: 0 8px 25px rgba(59, 130, 246, 0.2);
         }
         
+        .feature-card-grid {
+            display: grid;
+            grid-template-columns: repeat(3, 1fr);
+            gap: 1rem;
+            margin-bottom: 1rem;
+        }
+        
+        .feature-card-grid.steps {
+            grid-template-columns: repeat(4, 1fr);
+        }
+        
+        .feature-card-grid .feature-card {
+            margin-bottom: 0;
+        }
+        
+        .feature-card-grid h3, .feature-card-grid p {
+            color: inherit;
+        }
+        
+        @media (max-width: 768px) {
+            .feature-card-grid, .feature-card-grid.steps {
+                grid-template-columns: 1fr;
+            }
+        }
+        
         .metric-card {
             background: linear-gradient(135deg, #3b82f6 0%, #60a5fa 100%);
             padding: 1.5rem;
@@ -259,7 +392,31 @@ def apply_custom_css():
             animation: pulse 2s infinite;
         }
         </style>
-        """, unsafe_allow_html=True)
+        """
+
+def apply_custom_css():
+    """Apply custom CSS for stunning UI with dark/light mode support
+
+    The stylesheet is re-emitted on every run: Streamlit drops any element a
+    rerun does not produce again, so skipping it would unstyle the page.
+    """
+    
+    # The theme choice survives page reloads through the ?theme= query parameter
+    if 'dark_mode' not in st.session_state:
+        st.session_state.dark_mode = st.query_params.get("theme") == "dark"
+    
+    # Check if dark mode is enabled
+    dark_mode = st.session_state.dark_mode
+    st.markdown(DARK_CSS if dark_mode else LIGHT_CSS, unsafe_allow_html=True)
+
+def persist_theme():
+    """Record the dark mode toggle in the URL so reloads keep the theme"""
+    st.query_params["theme"] = "dark" if st.session_state.dark_mode else "light"
+
+def metric_row(metrics):
+    """Lay out a row of st.metric cards from (label, value[, delta]) tuples"""
+    for col, metric in zip(st.columns(len(metrics)), metrics):
+        col.metric(*metric)
 
 def create_sidebar():
     """Create beautiful animated sidebar navigation"""
@@ -267,42 +424,26 @@ def create_sidebar():
         # Header
         st.markdown("## 📃 Scanalyze")
         
-        # Dark/Light mode toggle - Fixed version
-        if 'dark_mode' not in st.session_state:
-            st.session_state.dark_mode = False
-        
-        dark_mode = st.toggle("🌙 Dark Mode", value=st.session_state.dark_mode, key="dark_mode_toggle")
-        
-        # Update dark mode state when toggle changes
-        if dark_mode != st.session_state.dark_mode:
-            st.session_state.dark_mode = dark_mode
-            st.rerun()
+        # Dark/Light mode toggle bound straight to session state: the new value is
+        # already set when the rerun starts, so the CSS above picks it up without
+        # a second st.rerun()
+        st.toggle("🌙 Dark Mode", key="dark_mode", on_change=persist_theme)
         
         st.markdown("---")
         
         # Navigation menu
         st.markdown("### 🧭 Navigation")
         
-        menu_items = [
-            {"name": "🏠 Home", "key": "home"},
-            {"name": "📤 Upload & Process", "key": "upload"},
-            {"name": "📷 Camera Capture", "key": "camera"},
-            {"name": "📊 View Results", "key": "results"},
-            {"name": "📈 Dashboard", "key": "dashboard"},
-            {"name": "📥 Export Data", "key": "export"},
-            {"name": "ℹ️ About", "key": "about"}
-        ]
-        
         # Initialize selected page if not exists
         if 'selected_page' not in st.session_state:
             st.session_state.selected_page = "home"
         
         selected_page = st.radio(
             "Choose a page:",
-            options=[item["key"] for item in menu_items],
-            format_func=lambda x: next(item["name"] for item in menu_items if item["key"] == x),
+            options=MENU_KEYS,
+            format_func=MENU_NAMES.__getitem__,
             key="navigation",
-            index=[item["key"] for item in menu_items].index(st.session_state.selected_page)
+            index=MENU_INDEX[st.session_state.selected_page]
         )
         
         # Update selected page
@@ -311,34 +452,42 @@ def create_sidebar():
         # Status indicator
         st.markdown("---")
         st.markdown("### 🔧 System Status")
-        backend_status = get_backend_status()
-        
-        if "Online" in backend_status:
-            st.success(backend_status)
-        else:
-            st.warning(backend_status)
+        sidebar_status()
         
         # Quick stats
         st.markdown("### 📊 Quick Stats")
-        try:
-            response = requests.get(f"{API_BASE_URL}/sheets/", timeout=2)
-            if response.status_code == 200:
-                sheets = response.json()["sheets"]
-                total_sheets = len(sheets)
-                completed = len([s for s in sheets if s["status"] == "completed"])
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric("📄 Total", total_sheets)
-                with col2:
-                    st.metric("✅ Done", completed)
-            else:
-                st.info("Connect to backend for stats")
-        except:
-            st.info("Backend offline")
+        sidebar_quick_stats()
         
         return selected_page
 
+# The sidebar panels refresh on their own schedule without rerunning the page
+@st.fragment(run_every=15)
+def sidebar_status():
+    """Backend status indicator"""
+    backend_status = get_backend_status()
+    
+    if "Online" in backend_status:
+        st.success(backend_status)
+    else:
+        st.warning(backend_status)
+
+@st.fragment(run_every=10)
+def sidebar_quick_stats():
+    """Sheet totals for the sidebar"""
+    if not backend_online():
+        st.info("Backend offline")
+        return
+    try:
+        sheets = fetch_sheets()
+        total_sheets = len(sheets)
+        completed = sum(1 for s in sheets if s["status"] == "completed")
+        
+        metric_row([("📄 Total", total_sheets), ("✅ Done", completed)])
+    except requests.exceptions.HTTPError:
+        st.info("Connect to backend for stats")
+    except requests.exceptions.RequestException:
+        st.info("Backend offline")
+
 def main():
     """Main application with stunning UI"""
     
@@ -372,8 +521,37 @@ def main():
     elif selected_page == "about":
         about_page()
 
+# Static home page content; kept free of blank lines so markdown treats it as one HTML block
+HOME_FEATURES_HTML = """
+<h2>✨ Key Features</h2>
+<div class="feature-card-grid">
+    <div class="feature-card">
+        <h3>📱 Smart Mobile Capture</h3>
+        <p>Use your phone's back camera for crystal-clear OMR sheet capture with automatic optimization.</p>
+        <p>✅ Back camera support<br>✅ Auto-focus &amp; lighting<br>✅ Real-time preview</p>
+    </div>
+    <div class="feature-card">
+        <h3>⚡ Bulk Processing</h3>
+        <p>Process multiple OMR sheets simultaneously with our advanced batch processing engine.</p>
+        <p>✅ Upload multiple files<br>✅ Parallel processing<br>✅ Progress tracking</p>
+    </div>
+    <div class="feature-card">
+        <h3>📊 Advanced Analytics</h3>
+        <p>Get detailed insights with comprehensive dashboards and exportable reports.</p>
+        <p>✅ Interactive charts<br>✅ CSV/Excel export<br>✅ Performance metrics</p>
+    </div>
+</div>
+<h2>🚀 Quick Start Guide</h2>
+<div class="feature-card-grid steps">
+    <div class="feature-card"><h3>1️⃣ Upload or Capture</h3><p>Choose your OMR sheets</p></div>
+    <div class="feature-card"><h3>2️⃣ Select Answer Key</h3><p>Choose Set A or B</p></div>
+    <div class="feature-card"><h3>3️⃣ Process &amp; Analyze</h3><p>AI does the magic</p></div>
+    <div class="feature-card"><h3>4️⃣ Export Results</h3><p>Download your reports</p></div>
+</div>
+"""
+
 def home_page():
-    """Beautiful home page with feature showcase - NO PROBLEMATIC HTML"""
+    """Beautiful home page with feature showcase"""
     
     # Welcome section - Using native Streamlit
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -388,52 +566,8 @@ def home_page():
         </div>
         """, unsafe_allow_html=True)
     
-    # Feature grid - SIMPLIFIED
-    st.markdown("## ✨ Key Features")
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown("### 📱 Smart Mobile Capture")
-        st.write("Use your phone's back camera for crystal-clear OMR sheet capture with automatic optimization.")
-        st.write("✅ Back camera support")
-        st.write("✅ Auto-focus & lighting")
-        st.write("✅ Real-time preview")
-    
-    with col2:
-        st.markdown("### ⚡ Bulk Processing")
-        st.write("Process multiple OMR sheets simultaneously with our advanced batch processing engine.")
-        st.write("✅ Upload multiple files")
-        st.write("✅ Parallel processing")
-        st.write("✅ Progress tracking")
-    
-    with col3:
-        st.markdown("### 📊 Advanced Analytics")
-        st.write("Get detailed insights with comprehensive dashboards and exportable reports.")
-        st.write("✅ Interactive charts")
-        st.write("✅ CSV/Excel export")
-        st.write("✅ Performance metrics")
-    
-    # Quick start section - SIMPLIFIED
-    st.markdown("## 🚀 Quick Start Guide")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.markdown("### 1️⃣ Upload or Capture")
-        st.write("Choose your OMR sheets")
-    
-    with col2:
-        st.markdown("### 2️⃣ Select Answer Key")
-        st.write("Choose Set A or B")
-    
-    with col3:
-        st.markdown("### 3️⃣ Process & Analyze")
-        st.write("AI does the magic")
-    
-    with col4:
-        st.markdown("### 4️⃣ Export Results")
-        st.write("Download your reports")
+    # Feature grid and quick start guide in a single markdown call
+    st.markdown(HOME_FEATURES_HTML, unsafe_allow_html=True)
     
     # Call to action - Fixed navigation
     st.markdown("---")
@@ -443,6 +577,37 @@ def home_page():
             st.session_state.selected_page = "upload"
             st.rerun()
 
+def make_thumbnail(data):
+    """Decode an uploaded image once and return a downscaled JPEG preview"""
+    image = Image.open(io.BytesIO(data)).convert("RGB")
+    image.thumbnail((PREVIEW_MAX_SIDE, PREVIEW_MAX_SIDE))
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=80)
+    return buffer.getvalue()
+
+def cached_previews(uploaded_files):
+    """Preview thumbnails for the current uploads, kept in session state by uploader file_id"""
+    cache = st.session_state.setdefault("preview_cache", {})
+    current = {file.file_id: file for file in uploaded_files}
+    # Forget previews of files the user has removed from the uploader
+    for key in cache.keys() - current.keys():
+        del cache[key]
+    for key, file in current.items():
+        if key not in cache:
+            cache[key] = make_thumbnail(file.getvalue())
+    return cache
+
+def camera_preview(image_data):
+    """Preview thumbnail of the current capture, rebuilt only when the capture changes"""
+    data = image_data.getvalue()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    cached = st.session_state.get("camera_preview")
+    if cached is None or cached[0] != digest:
+        cached = st.session_state["camera_preview"] = (digest, make_thumbnail(data))
+    return cached[1]
+
+# Page bodies are fragments, so their own widgets rerun just the page, not the sidebar
+@st.fragment
 def upload_and_process_page():
     """Enhanced upload page with beautiful UI"""
     
@@ -472,11 +637,11 @@ def upload_and_process_page():
             
             # Show preview of uploaded files
             if len(uploaded_files) <= 3:
+                previews = cached_previews(uploaded_files)
                 cols = st.columns(len(uploaded_files))
                 for i, file in enumerate(uploaded_files):
                     with cols[i]:
-                        image = Image.open(file)
-                        st.image(image, caption=f"📄 {file.name}", use_container_width=True)
+                        st.image(previews[file.file_id], caption=f"📄 {file.name}", use_container_width=True)
             else:
                 with st.expander("📋 View uploaded files"):
                     for file in uploaded_files:
@@ -484,6 +649,9 @@ def upload_and_process_page():
 
             if st.button("🚀 Process All Uploaded Sheets", type="primary"):
                 process_bulk_sheets(uploaded_files, set_choice)
+        
+        # The last batch summary persists across reruns and page switches
+        render_batch_summary()
     
     with col2:
         st.markdown("### 💡 Instructions")
@@ -525,7 +693,7 @@ def camera_capture_page():
 
         if back_camera_image is not None:
             st.success("📸 Image captured successfully!")
-            st.image(back_camera_image, caption="📱 Captured with Back Camera", use_container_width=True)
+            st.image(camera_preview(back_camera_image), caption="📱 Captured with Back Camera", use_container_width=True)
             
             set_choice_back = st.selectbox(
                 "🔑 Select Answer Key Set",
@@ -534,8 +702,17 @@ def camera_capture_page():
                 key="back_camera_set_choice"
             )
             
+            full_resolution = st.checkbox(
+                "🔬 Send full resolution",
+                help="Upload the original capture without downscaling (for debugging)",
+                key="back_camera_full_resolution"
+            )
+            
             if st.button("🚀 Process Captured Image", type="primary", key="process_back_camera"):
-                process_captured_image(back_camera_image, set_choice_back, "back_camera_capture.jpg")
+                process_captured_image(back_camera_image, set_choice_back, "back_camera_capture.jpg", full_resolution)
+
+        # Results live in session state so reruns re-render without re-posting
+        render_last_result()
 
     with col2:
         st.markdown("### 📱 Instructions")
@@ -559,112 +736,156 @@ def camera_capture_page():
 
 def process_bulk_sheets(uploaded_files, set_choice):
     """Enhanced bulk processing with beautiful progress UI"""
+    if not backend_online():
+        st.error("🔌 Cannot connect to server. Make sure the backend is running.")
+        return
+    
     summary_data = []
-    total_files = len(uploaded_files)
     
     st.info("🔄 Processing your OMR sheets... Please wait while AI analyzes your data")
     
     overall_progress = st.progress(0)
     status_text = st.empty()
     
-    for i, uploaded_file in enumerate(uploaded_files):
+    # Sheets already processed this session with the same answer key are reused
+    # instead of being uploaded and scored again
+    processed = st.session_state.setdefault("processed_sheets", {})
+    memo_keys = [(hashlib.blake2b(uploaded_file.getvalue(), digest_size=16).hexdigest(), set_choice) for uploaded_file in uploaded_files]
+    outcomes = [processed.get(memo_key) for memo_key in memo_keys]
+    pending = [i for i, outcome in enumerate(outcomes) if outcome is None]
+    total_pending = len(pending)
+    
+    # The remaining sheets go up in one multipart request
+    sheet_ids = []
+    if pending:
+        status_text.info(f"📤 Uploading {total_pending} sheet(s)...")
         try:
-            progress_percent = (i / total_files)
-            overall_progress.progress(progress_percent)
-            status_text.info(f"Processing {i+1}/{total_files}: {uploaded_file.name}")
-            
-            result = process_single_sheet(uploaded_file, set_choice)
-            
-            if result:
-                summary_data.append({
-                    "📄 Filename": uploaded_file.name,
-                    "🆔 Student ID": result.get("student_id", "N/A"),
-                    "📊 Total Score": f"{result['total_score']}/{result['total_questions']}",
-                    "📈 Percentage": f"{result['percentage']:.1f}%",
-                    "⏱️ Processing Time": f"{result['processing_time']:.2f}s",
-                    "✅ Status": "Success"
-                })
-            else:
-                summary_data.append({
-                    "📄 Filename": uploaded_file.name,
-                    "🆔 Student ID": "N/A",
-                    "📊 Total Score": "N/A",
-                    "📈 Percentage": "N/A",
-                    "⏱️ Processing Time": "N/A",
-                    "❌ Status": "Failed"
-                })
-                
+            sheet_ids = upload_sheets_bulk([uploaded_files[i] for i in pending], set_choice)
         except Exception as e:
-            summary_data.append({
-                "📄 Filename": uploaded_file.name,
-                "🆔 Student ID": "N/A",
-                "📊 Total Score": "N/A",
-                "📈 Percentage": "N/A",
-                "⏱️ Processing Time": "N/A",
-                "❌ Status": f"Error: {str(e)[:30]}..."
-            })
+            for i in pending:
+                outcomes[i] = (False, f"Upload failed: {e}")
+    
+    # Processing is I/O-bound on the backend, so the sheets are processed concurrently
+    if sheet_ids:
+        executor = get_executor()
+        futures = {executor.submit(process_sheet, sheet_id, set_choice): i for i, sheet_id in zip(pending, sheet_ids)}
+        last_paint = 0.0
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            outcomes[i] = future.result()
+            if outcomes[i][0]:
+                processed[memo_keys[i]] = outcomes[i]
+            # One progress element carries the count and name, repainted at most every PROGRESS_INTERVAL
+            now = time.monotonic()
+            if done == total_pending or now - last_paint >= PROGRESS_INTERVAL:
+                overall_progress.progress(done / total_pending, text=f"Processed {done}/{total_pending}: {uploaded_files[i].name}")
+                last_paint = now
+    
+    # Rows follow SUMMARY_COLUMNS; numbers stay numeric and are formatted by column_config
+    for uploaded_file, (ok, result) in zip(uploaded_files, outcomes):
+        if ok:
+            summary_data.append((
+                uploaded_file.name,
+                result.get("student_id", "N/A"),
+                f"{result['total_score']}/{result['total_questions']}",
+                float(result["percentage"]),
+                float(result["processing_time"]),
+                "Success"
+            ))
+        else:
+            summary_data.append((uploaded_file.name, "N/A", "N/A", None, None, f"Error: {result[:30]}..."))
     
     # Complete progress
+    refresh_backend_data()
     overall_progress.progress(1.0)
     status_text.success("✅ All files processed successfully!")
     
-    # Display enhanced summary
     if summary_data:
-        st.markdown("### 📊 Batch Processing Summary")
-        
-        df_summary = pd.DataFrame(summary_data)
-        st.dataframe(df_summary, use_container_width=True)
-        
-        # Enhanced statistics
-        successful = len([s for s in summary_data if "Success" in s.get("✅ Status", s.get("❌ Status", ""))])
-        failed = len(summary_data) - successful
-        
-        col1, col2, col3, col4 = st.columns(4)
+        st.session_state["last_batch"] = pd.DataFrame(summary_data, columns=SUMMARY_COLUMNS)
+
+@st.fragment
+def render_batch_summary():
+    """Render the most recent bulk processing summary from session state"""
+    df_summary = st.session_state.get("last_batch")
+    if df_summary is None:
+        return
+    
+    # Display enhanced summary
+    st.markdown("### 📊 Batch Processing Summary")
+    
+    st.dataframe(
+        df_summary,
+        use_container_width=True,
+        column_config={
+            "📈 Percentage": st.column_config.NumberColumn(format="%.1f%%"),
+            "⏱️ Processing Time": st.column_config.NumberColumn(format="%.2fs")
+        }
+    )
+    
+    # Enhanced statistics
+    successful = int((df_summary["✅ Status"] == "Success").sum())
+    failed = len(df_summary) - successful
+    
+    success_rate = successful / len(df_summary) * 100
+    metric_row([
+        ("📊 Total Processed", len(df_summary)),
+        ("✅ Successful", successful),
+        ("❌ Failed", failed),
+        ("📈 Success Rate", f"{success_rate:.1f}%")
+    ])
+    
+    # Export options
+    if successful > 0:
+        st.markdown("---")
+        col1, col2 = st.columns(2)
         with col1:
-            st.metric("📊 Total Processed", len(summary_data))
+            csv_download_button("📥 Download All Results (CSV)", "/export/all/csv", "all_results.csv", key="bulk_all_csv")
+        
         with col2:
-            st.metric("✅ Successful", successful)
-        with col3:
-            st.metric("❌ Failed", failed)
-        with col4:
-            success_rate = (successful / len(summary_data) * 100) if summary_data else 0
-            st.metric("📈 Success Rate", f"{success_rate:.1f}%")
-        
-        # Export options
-        if successful > 0:
-            st.markdown("---")
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("📥 Download All Results (CSV)", type="primary"):
-                    download_url = f"{API_BASE_URL}/export/all/csv"
-                    st.success(f"📥 [Click here to download CSV file]({download_url})")
-            
-            with col2:
-                st.info("📋 CSV file contains detailed results for all processed sheets including subject-wise breakdown")
+            st.info("📋 CSV file contains detailed results for all processed sheets including subject-wise breakdown")
 
-def process_single_sheet(uploaded_file, set_choice):
-    """Process a single OMR sheet - enhanced version"""
-    try:
+def upload_sheets_bulk(uploaded_files, set_choice):
+    """Upload all sheets in one multipart request, returning their sheet IDs in upload order"""
+    for uploaded_file in uploaded_files:
         uploaded_file.seek(0)
-        files = {"file": (uploaded_file.name, uploaded_file, uploaded_file.type)}
-        data = {"exam_version": set_choice}
-        
-        upload_response = requests.post(f"{API_BASE_URL}/upload-sheet/", files=files, data=data, timeout=30)
-        if upload_response.status_code != 200:
-            return None
+    # Stream the multipart body in chunks instead of building the whole batch in memory
+    encoder = MultipartEncoder(fields=[("files", (uploaded_file.name, uploaded_file, uploaded_file.type)) for uploaded_file in uploaded_files] + [("exam_version", set_choice)])
+    
+    upload_response = get_session().post(f"{API_BASE_URL}/upload-sheets-bulk/", data=encoder, headers={"Content-Type": encoder.content_type}, timeout=PROCESS_TIMEOUT)
+    upload_response.raise_for_status()
+    return [sheet["sheet_id"] for sheet in upload_response.json()["sheets"]]
 
-        sheet_id = upload_response.json()["sheet_id"]
-        process_response = requests.post(f"{API_BASE_URL}/process-sheet/{sheet_id}", params={"exam_version": set_choice}, timeout=30)
+def process_sheet(sheet_id, set_choice):
+    """Process one uploaded OMR sheet, returning (ok, result or error message)
+
+    Runs on worker threads, so it must not call any st.* functions.
+    """
+    try:
+        process_response = get_session().post(f"{API_BASE_URL}/process-sheet/{sheet_id}", params={"exam_version": set_choice}, timeout=PROCESS_TIMEOUT)
         
         if process_response.status_code != 200:
-            return None
+            return False, f"Processing failed ({process_response.status_code})"
+
+        return True, process_response.json()
+    except Exception as e:
+        return False, str(e)
 
-        return process_response.json()
-    except:
-        return None
+def compress_capture(image, downscale=True):
+    """Re-encode a captured image as compact JPEG bytes, downscaled unless asked not to"""
+    image = image.convert("RGB")
+    if downscale:
+        image.thumbnail((CAMERA_MAX_SIDE, CAMERA_MAX_SIDE), Image.LANCZOS)
+    buffer = io.BytesIO()
+    # Skip the extra Huffman optimisation pass; 4:2:0 chroma subsampling is plenty for bubbles
+    image.save(buffer, format='JPEG', quality=CAMERA_JPEG_QUALITY, optimize=False, subsampling=2)
+    return buffer.getvalue()
 
-def process_captured_image(image_data, set_choice, filename):
+def process_captured_image(image_data, set_choice, filename, full_resolution=False):
     """Enhanced camera image processing with beautiful UI"""
+    if not backend_online():
+        st.error("🔌 Cannot connect to server. Make sure the backend is running.")
+        return
+    
     try:
         progress_bar = st.progress(0)
         status_text = st.empty()
@@ -673,24 +894,37 @@ def process_captured_image(image_data, set_choice, filename):
         progress_bar.progress(10)
         
         # Process image data
-        if hasattr(image_data, 'read'):
-            image_data.seek(0)
-            files = {"file": (filename, image_data, "image/jpeg")}
+        content_type = "image/jpeg"
+        if isinstance(image_data, Image.Image):
+            # Decoded images have no original bytes to send, so full resolution just skips the resize
+            payload = compress_capture(image_data, downscale=not full_resolution)
         else:
-            img_byte_arr = io.BytesIO()
-            if isinstance(image_data, Image.Image):
-                image_data.save(img_byte_arr, format='JPEG')
+            if hasattr(image_data, 'read'):
+                image_data.seek(0)
+                image_data = image_data.read()
+            # Image.open only parses the header; JPEGs already within the size cap go out untouched
+            image = Image.open(io.BytesIO(image_data))
+            if full_resolution or (image.format == "JPEG" and max(image.size) <= CAMERA_MAX_SIDE):
+                payload = bytes(image_data)
+                content_type = Image.MIME.get(image.format, content_type)
             else:
-                img_byte_arr.write(image_data)
-            img_byte_arr.seek(0)
-            files = {"file": (filename, img_byte_arr, "image/jpeg")}
-        
-        data = {"exam_version": set_choice}
+                payload = compress_capture(image)
+        encoder = MultipartEncoder(fields={"file": (filename, payload, content_type), "exam_version": set_choice})
         
         status_text.info("📤 Uploading to AI processing engine...")
         progress_bar.progress(30)
         
-        upload_response = requests.post(f"{API_BASE_URL}/upload-sheet/", files=files, data=data, timeout=30)
+        # The upload fills 30-70% of the bar from the bytes actually sent,
+        # repainting only when the whole-percent step changes
+        last_step = [30]
+        def on_sent(monitor):
+            step = 30 + 40 * monitor.bytes_read // monitor.len
+            if step != last_step[0]:
+                progress_bar.progress(step)
+                last_step[0] = step
+        
+        monitor = MultipartEncoderMonitor(encoder, on_sent)
+        upload_response = get_session().post(f"{API_BASE_URL}/upload-sheet/", data=monitor, headers={"Content-Type": monitor.content_type}, timeout=PROCESS_TIMEOUT)
         
         if upload_response.status_code != 200:
             st.error(f"❌ Upload failed: {upload_response.text}")
@@ -701,17 +935,13 @@ def process_captured_image(image_data, set_choice, filename):
         status_text.info("🤖 AI is analyzing your OMR sheet...")
         progress_bar.progress(70)
         
-        process_response = requests.post(f"{API_BASE_URL}/process-sheet/{sheet_id}", params={"exam_version": set_choice}, timeout=30)
-        
-        if process_response.status_code != 200:
-            st.error(f"❌ Processing failed: {process_response.text}")
-            return
+        result = poll_processing_job(sheet_id, set_choice, lambda percent: progress_bar.progress(70 + 30 * percent // 100))
         
         progress_bar.progress(100)
         status_text.success("✅ Processing completed successfully!")
         
-        result = process_response.json()
-        display_single_result(result, sheet_id)
+        st.session_state["last_result"] = result
+        refresh_backend_data()
         
         progress_bar.empty()
         status_text.empty()
@@ -719,47 +949,100 @@ def process_captured_image(image_data, set_choice, filename):
     except Exception as e:
         st.error(f"❌ Error processing camera image: {str(e)}")
 
+def poll_processing_job(sheet_id, set_choice, on_progress):
+    """Start background processing of a sheet and poll it until done, reporting server-side percent"""
+    session = get_session()
+    start_response = session.post(f"{API_BASE_URL}/process-sheet/{sheet_id}/start", params={"exam_version": set_choice}, timeout=API_TIMEOUT)
+    start_response.raise_for_status()
+    
+    last_percent = None
+    deadline = time.monotonic() + JOB_TIMEOUT
+    while time.monotonic() < deadline:
+        job = session.get(f"{API_BASE_URL}/process-sheet/{sheet_id}/progress", timeout=API_TIMEOUT)
+        job.raise_for_status()
+        job = job.json()
+        if job["state"] == "done":
+            return job["result"]
+        if job["state"] == "error":
+            raise RuntimeError(f"Processing failed: {job['error']}")
+        if job["percent"] != last_percent:
+            on_progress(job["percent"])
+            last_percent = job["percent"]
+        time.sleep(POLL_INTERVAL)
+    raise TimeoutError("Processing did not finish in time")
+
+@st.fragment
+def render_last_result():
+    """Render the most recently processed sheet from session state"""
+    result = st.session_state.get("last_result")
+    if not result:
+        return
+    display_single_result(result, result["sheet_id"])
+
 def display_single_result(result, sheet_id):
     """Enhanced single result display with beautiful metrics"""
     st.success("🎉 OMR Sheet processed successfully! Here are your results:")
     
     # Enhanced metrics display
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("📊 Total Score", f"{result['total_score']}/{result['total_questions']}")
-    with col2:
-        st.metric("📈 Percentage", f"{result['percentage']:.1f}%")
-    with col3:
-        st.metric("⏱️ Processing Time", f"{result['processing_time']:.2f}s")
+    metric_row([
+        ("📊 Total Score", f"{result['total_score']}/{result['total_questions']}"),
+        ("📈 Percentage", f"{result['percentage']:.1f}%"),
+        ("⏱️ Processing Time", f"{result['processing_time']:.2f}s")
+    ])
     
     # Subject-wise results
     st.markdown("### 📊 Subject-wise Results")
     
-    subject_data = []
-    for subject, scores in result['subject_scores'].items():
-        subject_data.append({
-            "📚 Subject": subject,
-            "✅ Correct": scores["correct"],
-            "❌ Wrong": scores["wrong"],
-            "⭕ Blank": scores.get("blank", 0),
-            "📈 Score %": f"{scores['score_percentage']:.1f}%"
-        })
+    rows = tuple(sorted(
+        (subject, scores["correct"], scores["wrong"], scores.get("blank", 0), scores["score_percentage"])
+        for subject, scores in result['subject_scores'].items()
+    ))
+    display_subject_results(rows)
     
-    df = pd.DataFrame(subject_data)
-    st.dataframe(df, use_container_width=True)
+    # Export option
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        csv_download_button("📥 Download Results as CSV", f"/export/sheet/{sheet_id}/csv", f"sheet_{sheet_id}_results.csv", key="single_sheet_csv", prefetch=True)
+    
+    with col2:
+        st.info("📋 CSV includes detailed breakdown of all subjects and scores")
+
+def display_subject_results(rows):
+    """Subject-wise table and bar chart for a tuple of (subject, correct, wrong, blank, pct) rows"""
+    # A handful of rows renders as a static table rather than an interactive grid
+    st.table(build_subject_df(rows).set_index("📚 Subject").style.format({"📈 Score %": "{:.1f}%"}))
     
     # Enhanced visualization
+    st.plotly_chart(build_subject_bar(rows), use_container_width=True)
+
+@st.cache_data(show_spinner=False)
+def build_subject_df(rows):
+    """Subject-wise results table, without the blank column when counts are unknown"""
+    df = pd.DataFrame(rows, columns=["📚 Subject", "✅ Correct", "❌ Wrong", "⭕ Blank", "📈 Score %"])
+    if df["⭕ Blank"].isna().all():
+        df = df.drop(columns="⭕ Blank")
+    return df
+
+@st.cache_data(show_spinner=False)
+def build_subject_bar(rows):
+    """Subject-wise score bar chart for a tuple of result rows"""
+    import plotly.graph_objects as go
+    
+    subjects = [row[0] for row in rows]
+    # One numeric array feeds the bar heights, colours and labels
+    percentages = np.fromiter((row[4] for row in rows), dtype=float, count=len(rows))
     fig = go.Figure(data=[
         go.Bar(
-            x=[s["📚 Subject"] for s in subject_data],
-            y=[float(s["📈 Score %"].replace('%', '')) for s in subject_data],
+            x=subjects,
+            y=percentages,
             marker=dict(
-                color=[float(s["📈 Score %"].replace('%', '')) for s in subject_data],
+                color=percentages,
                 colorscale='Blues',
                 showscale=True,
                 colorbar=dict(title="Score %")
             ),
-            text=[s["📈 Score %"] for s in subject_data],
+            text=[f"{pct:.1f}%" for pct in percentages],
             textposition='auto',
         )
     ])
@@ -771,100 +1054,176 @@ def display_single_result(result, sheet_id):
         template="plotly_white",
         height=400
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Export option
-    st.markdown("---")
-    col1, col2 = st.columns(2)
-    with col1:
-        download_url = f"{API_BASE_URL}/export/sheet/{sheet_id}/csv"
-        if st.button("📥 Download Results as CSV", type="primary"):
-            st.success(f"📥 [Click here to download your results]({download_url})")
-    
-    with col2:
-        st.info("📋 CSV includes detailed breakdown of all subjects and scores")
+    return fig
 
+@st.fragment
 def view_results_page():
     """Enhanced results viewing page"""
     st.markdown("## 📊 View Results")
     st.info("Browse and analyze previously processed OMR sheets")
     
+    if not backend_online():
+        st.error("🔌 Cannot connect to server. Make sure the backend is running.")
+        return
+    
+    if st.button("🔄 Refresh", key="refresh_results"):
+        refresh_backend_data()
+    
     try:
-        response = requests.get(f"{API_BASE_URL}/sheets/", timeout=10)
-        if response.status_code == 200:
-            sheets_data = response.json()
-            sheets = sheets_data["sheets"]
-            
-            if sheets:
-                sheet_options = [f"Sheet {sheet['id']} - {sheet['student_id']} ({sheet['status']})" for sheet in sheets]
-                selected_option = st.selectbox("🔍 Select a sheet to view results:", sheet_options)
-                
-                if selected_option:
-                    sheet_id = int(selected_option.split(" ")[1])
-                    display_detailed_results(sheet_id)
-            else:
-                st.info("📋 No sheets processed yet. Upload and process sheets first from the Upload page.")
-        else:
-            st.error("❌ Failed to fetch sheets list. Check if backend is running.")
-            
+        sheets = fetch_sheets()
+    except requests.exceptions.HTTPError:
+        st.error("❌ Failed to fetch sheets list. Check if backend is running.")
+        return
     except requests.exceptions.RequestException:
         st.error("🔌 Cannot connect to server. Make sure the backend is running.")
+        return
+    
+    if sheets:
+        # Options are the raw ids; labels are only formatted for display
+        sheets_by_id = {sheet["id"]: sheet for sheet in sheets}
+        sheet_id = st.selectbox(
+            "🔍 Select a sheet to view results:",
+            list(sheets_by_id),
+            format_func=lambda i: f"Sheet {i} - {sheets_by_id[i]['student_id']} ({sheets_by_id[i]['status']})"
+        )
+        
+        if sheet_id is not None:
+            display_detailed_results(sheet_id)
+    else:
+        st.info("📋 No sheets processed yet. Upload and process sheets first from the Upload page.")
+
+@st.cache_data(show_spinner=False)
+def build_status_pie(status_items):
+    """Status pie chart for a tuple of (status, count) pairs"""
+    import plotly.graph_objects as go
+    
+    fig_status = go.Figure(data=[
+        go.Pie(
+            labels=[status for status, _ in status_items],
+            values=[count for _, count in status_items],
+            hole=0.3,
+            marker=dict(colors=['#3b82f6', '#60a5fa', '#93c5fd'])
+        )
+    ])
+    fig_status.update_layout(
+        title="📊 Processing Status Distribution",
+        height=400
+    )
+    return fig_status
+
+@st.cache_data(show_spinner=False)
+def build_score_histogram(scores):
+    """Score histogram for a tuple of total scores
+
+    Binned here with numpy so the figure carries ten bars instead of every score.
+    """
+    import plotly.graph_objects as go
+    
+    counts, edges = np.histogram(scores, bins=10)
+    fig_scores = go.Figure(data=[
+        go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            marker=dict(
+                color='#3b82f6',
+                opacity=0.8
+            )
+        )
+    ])
+    fig_scores.update_layout(
+        title="📈 Score Distribution Analysis",
+        xaxis_title="Score",
+        yaxis_title="Frequency",
+        height=400
+    )
+    return fig_scores
+
+@st.cache_data(ttl=10, show_spinner=False)
+def fetch_sheets():
+    """Fetch the sheet list from the backend, cached briefly across reruns"""
+    response = get_session().get(f"{API_BASE_URL}/sheets/", timeout=API_TIMEOUT)
+    response.raise_for_status()
+    # orjson decodes straight from the response bytes, skipping the text decode
+    data = orjson.loads(response.content) if ORJSON_AVAILABLE else response.json()
+    return data["sheets"]
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_sheet_results(sheet_id):
+    """Fetch detailed results for a single sheet from the backend"""
+    response = get_session().get(f"{API_BASE_URL}/sheet/{sheet_id}/results", timeout=API_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_csv(path):
+    """Fetch a CSV export from the backend, cached so repeat downloads don't regenerate it"""
+    response = get_session().get(f"{API_BASE_URL}{path}", timeout=PROCESS_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+def csv_download_button(label, path, file_name, key, type="primary", prefetch=False):
+    """Serve a backend CSV export through st.download_button
+
+    The export is only fetched once the user asks for it, unless prefetch is
+    set for freshly processed results; prepared paths are remembered for the
+    session so the download button stays in place. Prefetching applies to this
+    button only and leaves other buttons for the same path deferred.
+    """
+    prepared = st.session_state.setdefault("prepared_csv", set())
+    if not prefetch and path not in prepared:
+        st.button("📄 Prepare CSV", key=f"prepare_{key}", type=type, on_click=prepared.add, args=(path,))
+        return
+    try:
+        data = fetch_csv(path)
+    except requests.exceptions.RequestException as e:
+        st.error(f"❌ CSV export unavailable: {str(e)}")
+        return
+    st.download_button(label, data=data, file_name=file_name, mime="text/csv", type=type, key=key)
+
+def refresh_backend_data():
+    """Drop cached backend responses so the next fetch hits the server"""
+    fetch_sheets.clear()
+    fetch_sheet_results.clear()
+    fetch_csv.clear()
+
+def fetch_subject_breakdown(sheet_id):
+    """Map subject name to score percentage for a sheet, empty if unavailable"""
+    try:
+        results = fetch_sheet_results(sheet_id)
+    except requests.exceptions.RequestException:
+        return {}
+    return {subject: data["percentage"] for subject, data in results["subject_results"].items()}
 
 def display_detailed_results(sheet_id):
     """Enhanced detailed results display"""
     try:
-        response = requests.get(f"{API_BASE_URL}/sheet/{sheet_id}/results", timeout=10)
-        if response.status_code == 200:
-            results = response.json()
-            
+        results = fetch_sheet_results(sheet_id)
+        if results:
             # Header metrics
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("📄 Sheet ID", results["sheet_id"])
-            with col2:
-                st.metric("🆔 Student ID", results["student_id"])
-            with col3:
-                st.metric("📊 Status", results["status"])
-            with col4:
-                st.metric("📃 Total Score", results["total_score"] if results["total_score"] is not None else "N/A")
+            metric_row([
+                ("📄 Sheet ID", results["sheet_id"]),
+                ("🆔 Student ID", results["student_id"]),
+                ("📊 Status", results["status"]),
+                ("📃 Total Score", results["total_score"] if results["total_score"] is not None else "N/A")
+            ])
             
             if results["status"] == "completed" and results["subject_results"]:
                 # Enhanced subject results
                 st.markdown("### 📚 Subject-wise Performance")
                 
-                subject_df = pd.DataFrame([
-                    {
-                        "📚 Subject": subject,
-                        "✅ Correct": data["correct"],
-                        "❌ Wrong": data["wrong"],
-                        "📈 Percentage": f"{data['percentage']:.1f}%"
-                    }
+                # Stored results carry no blank count
+                rows = tuple(sorted(
+                    (subject, data["correct"], data["wrong"], None, data["percentage"])
                     for subject, data in results["subject_results"].items()
-                ])
-                
-                st.dataframe(subject_df, use_container_width=True)
-                
-                # Enhanced visualization
-                fig = px.bar(
-                    subject_df,
-                    x="📚 Subject",
-                    y=[float(p.replace('%', '')) for p in subject_df["📈 Percentage"]],
-                    title="📊 Subject-wise Performance Analysis",
-                    color=[float(p.replace('%', '')) for p in subject_df["📈 Percentage"]],
-                    color_continuous_scale="Blues",
-                    labels={"y": "Score Percentage"}
-                )
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
+                ))
+                display_subject_results(rows)
                 
                 # Export options
                 st.markdown("---")
                 col1, col2 = st.columns(2)
                 with col1:
-                    download_url = f"{API_BASE_URL}/export/sheet/{sheet_id}/csv"
-                    if st.button("📥 Download Sheet Results", type="primary"):
-                        st.success(f"📥 [Click to download CSV]({download_url})")
+                    csv_download_button("📥 Download Sheet Results", f"/export/sheet/{sheet_id}/csv", f"sheet_{sheet_id}_results.csv", key="detail_sheet_csv")
                 
                 with col2:
                     st.info("📋 Detailed results with subject breakdown")
@@ -874,117 +1233,105 @@ def display_detailed_results(sheet_id):
     except Exception as e:
         st.error(f"❌ Error displaying results: {str(e)}")
 
+@st.fragment
 def dashboard_page():
     """Enhanced dashboard with stunning visualizations"""
     st.markdown("## 📈 System Dashboard")
     st.info("Comprehensive analytics and insights for your OMR processing system")
     
+    if not backend_online():
+        st.error("🔌 Cannot connect to server. Make sure the backend is running.")
+        return
+    
+    if st.button("🔄 Refresh", key="refresh_dashboard"):
+        refresh_backend_data()
+    
     try:
-        response = requests.get(f"{API_BASE_URL}/sheets/", timeout=10)
-        if response.status_code == 200:
-            sheets_data = response.json()
-            sheets = sheets_data["sheets"]
+        sheets = fetch_sheets()
+        
+        if sheets:
+            # Enhanced overview metrics, aggregated column-wise in pandas
+            sheets_df = pd.DataFrame(sheets)
+            status_counts = sheets_df["status"].value_counts()
+            total_sheets = len(sheets_df)
+            completed_count = int(status_counts.get("completed", 0))
             
-            if sheets:
-                # Enhanced overview metrics
-                completed_sheets = [s for s in sheets if s["status"] == "completed"]
-                total_sheets = len(sheets)
-                completed_count = len(completed_sheets)
-                
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("📊 Total Sheets", total_sheets)
-                with col2:
-                    st.metric("✅ Completed", completed_count)
-                with col3:
-                    processing_rate = (completed_count/total_sheets*100) if total_sheets > 0 else 0
-                    st.metric("📈 Success Rate", f"{processing_rate:.1f}%")
-                with col4:
-                    valid_scores = [s["total_score"] for s in completed_sheets if s["total_score"] is not None]
-                    avg_score = sum(valid_scores) / len(valid_scores) if valid_scores else 0
-                    st.metric("📃 Avg Score", f"{avg_score:.1f}")
-                
+            processing_rate = (completed_count/total_sheets*100) if total_sheets > 0 else 0
+            valid_scores = sheets_df.loc[sheets_df["status"] == "completed", "total_score"].dropna()
+            avg_score = valid_scores.mean() if not valid_scores.empty else 0
+            
+            metric_row([
+                ("📊 Total Sheets", total_sheets),
+                ("✅ Completed", completed_count),
+                ("📈 Success Rate", f"{processing_rate:.1f}%"),
+                ("📃 Avg Score", f"{avg_score:.1f}")
+            ])
+            
+            # Charts and the recent-activity breakdowns only run when switched on, so
+            # an unrelated rerun doesn't pay for figure serialization or extra fetches
+            if st.toggle("📊 Show charts", key="dashboard_charts"):
                 # Enhanced charts
                 col1, col2 = st.columns(2)
                 
                 with col1:
                     # Status distribution with enhanced styling
-                    status_counts = {}
-                    for sheet in sheets:
-                        status = sheet["status"]
-                        status_counts[status] = status_counts.get(status, 0) + 1
-                    
-                    fig_status = go.Figure(data=[
-                        go.Pie(
-                            labels=list(status_counts.keys()),
-                            values=list(status_counts.values()),
-                            hole=0.3,
-                            marker=dict(colors=['#3b82f6', '#60a5fa', '#93c5fd'])
-                        )
-                    ])
-                    fig_status.update_layout(
-                        title="📊 Processing Status Distribution",
-                        height=400
-                    )
-                    st.plotly_chart(fig_status, use_container_width=True)
+                    status_items = tuple(sorted(status_counts.items()))
+                    st.plotly_chart(build_status_pie(status_items), use_container_width=True)
                 
                 with col2:
                     # Enhanced score distribution
-                    if valid_scores:
-                        fig_scores = go.Figure(data=[
-                            go.Histogram(
-                                x=valid_scores,
-                                nbinsx=10,
-                                marker=dict(
-                                    color='#3b82f6',
-                                    opacity=0.8
-                                )
-                            )
-                        ])
-                        fig_scores.update_layout(
-                            title="📈 Score Distribution Analysis",
-                            xaxis_title="Score",
-                            yaxis_title="Frequency",
-                            height=400
-                        )
-                        st.plotly_chart(fig_scores, use_container_width=True)
+                    if not valid_scores.empty:
+                        scores = tuple(valid_scores.tolist())
+                        st.plotly_chart(build_score_histogram(scores), use_container_width=True)
                     else:
                         st.info("📊 No score data available yet. Process some sheets to see analytics.")
+            
+            # Recent activity with enhanced styling
+            st.markdown("### 🕐 Recent Activity")
+            
+            if st.toggle("🔍 Load recent activity", key="dashboard_recent"):
+                # Top-10 selection on parsed timestamps, which the table also renders directly;
+                # trimming to seconds gives every row one format
+                uploaded_at = pd.to_datetime(sheets_df["upload_time"].str.slice(0, 19), errors="coerce")
+                recent = sheets_df.assign(uploaded_at=uploaded_at).nlargest(10, "uploaded_at")
                 
-                # Recent activity with enhanced styling
-                st.markdown("### 🕐 Recent Activity")
+                # Fetch subject breakdowns for the recent sheets concurrently
+                breakdowns = list(get_fanout_executor().map(fetch_subject_breakdown, recent["id"].tolist()))
                 
-                recent_sheets = sorted(sheets, key=lambda x: x["upload_time"] if x["upload_time"] else "", reverse=True)[:10]
+                recent_df = pd.DataFrame({
+                    "📄 Sheet ID": recent["id"],
+                    "🆔 Student ID": recent["student_id"],
+                    "📊 Status": recent["status"],
+                    "📃 Score": recent["total_score"],
+                    "📅 Upload Time": recent["uploaded_at"]
+                }).join(pd.DataFrame(breakdowns, index=recent.index))
                 
-                recent_df = pd.DataFrame([
-                    {
-                        "📄 Sheet ID": sheet["id"],
-                        "🆔 Student ID": sheet["student_id"],
-                        "📊 Status": sheet["status"],
-                        "📃 Score": sheet["total_score"] if sheet["total_score"] is not None else "N/A",
-                        "📅 Upload Time": sheet["upload_time"][:19] if sheet["upload_time"] else "N/A"
+                subject_names = {subject for breakdown in breakdowns for subject in breakdown}
+                st.dataframe(
+                    recent_df,
+                    width=TABLE_WIDTH,
+                    column_config={
+                        "🆔 Student ID": st.column_config.TextColumn(width="medium"),
+                        "📃 Score": st.column_config.NumberColumn(format="%d"),
+                        "📅 Upload Time": st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm:ss", width="medium"),
+                        **{subject: st.column_config.NumberColumn(format="%.1f%%") for subject in subject_names}
                     }
-                    for sheet in recent_sheets
-                ])
-                
-                st.dataframe(recent_df, use_container_width=True)
-                
-                # Export section
-                st.markdown("---")
-                col1, col2 = st.columns(2)
-                with col1:
-                    download_url = f"{API_BASE_URL}/export/all/csv"
-                    if st.button("📥 Export All System Data", type="primary"):
-                        st.success(f"📊 [Download Complete System Report]({download_url})")
-                
-                with col2:
-                    st.info("📋 Complete system data with all processed sheets and detailed analytics")
-                
-            else:
-                st.info("📊 No data available yet. Process some OMR sheets to see comprehensive dashboard statistics.")
+                )
+            
+            # Export section
+            st.markdown("---")
+            col1, col2 = st.columns(2)
+            with col1:
+                csv_download_button("📥 Export All System Data", "/export/all/csv", "all_results.csv", key="dashboard_all_csv")
+            
+            with col2:
+                st.info("📋 Complete system data with all processed sheets and detailed analytics")
+            
         else:
-            st.error("❌ Failed to fetch dashboard data. Check backend connection.")
+            st.info("📊 No data available yet. Process some OMR sheets to see comprehensive dashboard statistics.")
             
+    except requests.exceptions.HTTPError:
+        st.error("❌ Failed to fetch dashboard data. Check backend connection.")
     except Exception as e:
         st.error(f"🔌 Error loading dashboard: {str(e)}. Make sure the backend server is running.")
 
@@ -993,41 +1340,59 @@ def export_data_page():
     st.markdown("## 📥 Export Data")
     st.info("Download your OMR processing results in various formats")
     
+    if not backend_online():
+        st.error("🔌 Cannot connect to server. Make sure the backend is running.")
+        return
+    
+    if st.button("🔄 Refresh", key="refresh_export"):
+        refresh_backend_data()
+    
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("### 📊 Export All Results")
         st.info("Download comprehensive data for all processed OMR sheets")
         
-        if st.button("📥 Export All Results as CSV", type="primary"):
-            export_all_url = f"{API_BASE_URL}/export/all/csv"
-            st.success(f"📊 [Click here to download complete system data]({export_all_url})")
+        csv_download_button("📥 Export All Results as CSV", "/export/all/csv", "all_results.csv", key="export_all_csv")
     
     with col2:
         st.markdown("### 📋 Export Individual Sheet")
         st.info("Select and download results for specific sheets")
         
         try:
-            response = requests.get(f"{API_BASE_URL}/sheets/", timeout=10)
-            if response.status_code == 200:
-                sheets_data = response.json()
-                completed_sheets = [s for s in sheets_data["sheets"] if s["status"] == "completed"]
-                
-                if completed_sheets:
-                    sheet_options = [f"Sheet {sheet['id']} - {sheet['student_id']}" for sheet in completed_sheets]
-                    selected_sheet = st.selectbox("🔍 Select sheet to export:", sheet_options)
-                    
-                    if selected_sheet and st.button("📥 Export Selected Sheet"):
-                        sheet_id = int(selected_sheet.split(" ")[1])
-                        export_sheet_url = f"{API_BASE_URL}/export/sheet/{sheet_id}/csv"
-                        st.success(f"📋 [Download Sheet {sheet_id} results]({export_sheet_url})")
-                else:
-                    st.info("📋 No completed sheets available for export. Process some sheets first.")
-            else:
-                st.error("❌ Failed to fetch sheets for export")
-                
-        except Exception as e:
+            sheets = fetch_sheets()
+        except requests.exceptions.HTTPError:
+            st.error("❌ Failed to fetch sheets for export")
+            return
+        except requests.exceptions.RequestException as e:
             st.error(f"🔌 Error fetching export options: {str(e)}")
+            return
+        
+        completed_sheets = [s for s in sheets if s["status"] == "completed"]
+        
+        if completed_sheets:
+            # Options carry the sheet id itself; the label is only formatted for display
+            id_to_student = {sheet["id"]: sheet["student_id"] for sheet in completed_sheets}
+            sheet_id = st.selectbox("🔍 Select sheet to export:", list(id_to_student), format_func=lambda i: f"Sheet {i} - {id_to_student[i]}")
+            
+            if sheet_id is not None:
+                csv_download_button("📥 Export Selected Sheet", f"/export/sheet/{sheet_id}/csv", f"sheet_{sheet_id}_results.csv", key="export_sheet_csv", type="secondary")
+        else:
+            st.info("📋 No completed sheets available for export. Process some sheets first.")
+
+@st.cache_data(show_spinner=False)
+def features_df():
+    """Static About page feature table, built once per process"""
+    features_data = [
+        {"Feature": "📱 Smart Mobile Capture", "Description": "AI-optimized camera capture with automatic sheet detection", "Status": "Active"},
+        {"Feature": "🚀 Bulk Processing", "Description": "Process multiple sheets simultaneously with parallel computing", "Status": "Active"},
+        {"Feature": "📃 Auto ID Generation", "Description": "Intelligent student and exam ID assignment system", "Status": "Active"},
+        {"Feature": "📊 Advanced Analytics", "Description": "Comprehensive dashboards with interactive visualizations", "Status": "Active"},
+        {"Feature": "📥 Multi-format Export", "Description": "CSV, Excel, and PDF export capabilities", "Status": "Active"},
+        {"Feature": "🌙 Dark/Light Theme", "Description": "Adaptive UI with user-preferred color schemes", "Status": "Fixed!"},
+    ]
+    
+    return pd.DataFrame(features_data).set_index("Feature")
 
 def about_page():
     """Enhanced about page - COMPLETELY FIXED, NO PROBLEMATIC HTML"""
@@ -1066,38 +1431,36 @@ def about_page():
     # Features showcase
     st.markdown("## ✨ Advanced Features")
     
-    features_data = [
-        {"Feature": "📱 Smart Mobile Capture", "Description": "AI-optimized camera capture with automatic sheet detection", "Status": "Active"},
-        {"Feature": "🚀 Bulk Processing", "Description": "Process multiple sheets simultaneously with parallel computing", "Status": "Active"},
-        {"Feature": "📃 Auto ID Generation", "Description": "Intelligent student and exam ID assignment system", "Status": "Active"},
-        {"Feature": "📊 Advanced Analytics", "Description": "Comprehensive dashboards with interactive visualizations", "Status": "Active"},
-        {"Feature": "📥 Multi-format Export", "Description": "CSV, Excel, and PDF export capabilities", "Status": "Active"},
-        {"Feature": "🌙 Dark/Light Theme", "Description": "Adaptive UI with user-preferred color schemes", "Status": "Fixed!"},
-    ]
-    
-    features_df = pd.DataFrame(features_data)
-    st.dataframe(features_df, use_container_width=True)
+    st.table(features_df())
     
     # Technical specifications
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric("📃 Exam Format", "100 Questions", "5 subjects × 20 each")
-    with col2:
-        st.metric("📈 Accuracy", "99%+", "AI-powered precision")
-    with col3:
-        st.metric("⚡ Speed", "< 3 seconds", "Per sheet processing")
+    metric_row([
+        ("📃 Exam Format", "100 Questions", "5 subjects × 20 each"),
+        ("📈 Accuracy", "99%+", "AI-powered precision"),
+        ("⚡ Speed", "< 3 seconds", "Per sheet processing")
+    ])
+
+@st.cache_data(ttl=3, show_spinner=False)
+def backend_online():
+    """Whether the API port accepts connections, memoized so reruns don't re-probe
+
+    A plain TCP connect is much cheaper than a full HTTP round-trip, and lets
+    pages bail out at once instead of waiting on request timeouts.
+    """
+    url = urlsplit(API_BASE_URL)
+    port = url.port or (443 if url.scheme == "https" else 80)
+    probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    probe.settimeout(HEALTH_TIMEOUT)
+    try:
+        return probe.connect_ex((url.hostname, port)) == 0
+    except OSError:
+        return False
+    finally:
+        probe.close()
 
 def get_backend_status():
     """Enhanced backend status check"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/", timeout=2)
-        if response.status_code == 200:
-            return "🟢 Online & Ready"
-        else:
-            return "🟡 Issues Detected"
-    except:
-        return "🔴 Offline"
+    return "🟢 Online & Ready" if backend_online() else "🔴 Offline"
 
 if __name__ == "__main__":
     main()
\ No newline at end of file